@@ -65,7 +65,7 @@
 #           if reference = 0 and user is none, then delete all Annots of the specified Annot Type
 #
 #       append - add Annots from the input file
-#           (does not check for duplicates)
+#           (duplicate Evidence is not loaded)
 #
 #       preview - perform all record verifications but do not load the data or
 #           make any changes to the database. Used for testing or to preview the load.
@@ -142,7 +142,7 @@
 
 import sys
 import os
-import re
+import concurrent.futures
 import db
 import accessionlib
 import mgi_utils
@@ -189,6 +189,15 @@ evidenceFileName = ''	# file name
 propertyFileName = ''	# file name
 noteFileName = ''	# file name
 
+# bcp lines are buffered here and written to the bcp files
+# with a single writelines() per file every bcpBufferSize lines
+annotBuf = []		# VOC_Annot lines
+evidenceBuf = []	# VOC_Evidence lines
+propertyBuf = []	# VOC_Evidence_Property lines
+noteBuf = []		# MGI_Note lines
+bcpBufferSize = 10000
+bcpFileBuffering = 1048576	# open() buffer size of the input and bcp files
+
 delByReferenceKey = 0	# deletion reference key
 annotTypeKey = 0	# VOC_AnnotType._AnnotType_key
 annotKey = 0		# VOC_Annot._Annot_key
@@ -196,43 +205,58 @@ evidencePrimaryKey = 0	# VOC_Evidence._AnnotEvidence_key
 propertyKey = 0		# VOC_Evidence_Property._EvidenceProperty_key
 logicalDBKey = 1	# ACC_Accession._LogicalDB_key (default is "MGI", 1)
 noteKey = 0		# MGI_Note._Note_key
+lastAnnotKey = 0	# last key of each block reserved by setPrimaryKeys
+lastEvidenceKey = 0
+lastNoteKey = 0
+lastPropertyKey = 0
 mgiNoteObjectKey = 25	# MGI_Note._MGIType_key
 mgiNoteTypeKey = 1008	# MGI_Note._NoteType_key
 
+# termDict, objectDict and referenceDict keys are lower case accession ids
 termDict = {}		# dictionary of terms for quick lookup
 objectDict = {}		# dictionary of objects for quick lookup
 referenceDict = {}	# dictionary of references for quick lookup
 annotDict = {}		# dictionary of annotation records for quick lookup
-evidenceDict = {}	# dictionary of evidence records for quick lookup
+			# key = (_Object_key, _Term_key, _Qualifier_key)
+evidenceSet = set()	# set of evidence record keys for duplicate checks
 pTermDict = {}		# dictionary of propery terms for quick lookup
+logicalDBDict = {}	# dictionary of logical DB names (field 10) for quick lookup
+editorDict = {}		# dictionary of editors (MGI_User) for quick lookup
+badTermDict = {}	# dictionary of invalid term ids/number of lines
+badReferenceDict = {}	# dictionary of invalid references/number of lines
+badObjectDict = {}	# dictionary of invalid (object id, logical DB key)/number of lines
 
 loaddate = loadlib.loaddate
 
 # execute this SQL after the bcp files
 execSQL = ''
 
-# true (1) if this is the mcvload
-isMCV = 0
+# true (1) if no bcp files to load
+skipBCP = 1
 
-# true (1) if this is a MP load
-isMP = 0
+# true (1) once the objectLookup statement used by verifyObject is prepared
+objectLookupPrepared = 0
 
-# true (1) if this is a goload
-isGO = 0
+# valid load types (see Usage)
+loadTypes = ('mcv', 'mp', 'go', 'diseaseMarker', 'diseaseAllele', 'mpMarker', 'mpAllele', 'omimhpo')
 
-# true (1) if this is a disease/marker, disease/allele rollup load
-isDiseaseMarker = 0
-isDiseaseAllele = 0
+# evidence duplicate-check key by load type
+# arguments: annot key, evidence key, reference key, properties, notes, inferred from
+evidenceKeyDict = {
+    'mp'            : lambda a, e, r, p, n, i: (a, e, r, p),
+    'omimhpo'       : lambda a, e, r, p, n, i: (a, e, r, p),
+    'mpMarker'      : lambda a, e, r, p, n, i: (a, e, r, p, n),
+    'mpAllele'      : lambda a, e, r, p, n, i: (a, e, r, p, n),
+    'go'            : lambda a, e, r, p, n, i: (a, e, r, p, i),
+    'diseaseMarker' : lambda a, e, r, p, n, i: (a, e, r, p, i),
+    'diseaseAllele' : lambda a, e, r, p, n, i: (a, e, r, p, i),
+}
 
-# true (1) if this is an MP/marker, MP/allele rollup load
-isMPMarker = 0
-isMPAllele = 0
+# default duplication check
+defaultEvidenceKey = lambda a, e, r, p, n, i: (a, e, r)
 
-# true (1) if this is an OMIM/HPO load
-isOMIMHPO = 0
-
-# true (1) if no bcp files to load
-skipBCP = 1
+# builds the evidence duplicate-check key for this load (see init)
+makeEvidenceKey = defaultEvidenceKey
 
 def exit(status, message = None):
     '''
@@ -249,6 +273,14 @@ def exit(status, message = None):
     if message is not None:
         sys.stderr.write('\n' + str(message) + '\n')
 
+    # give back the keys reserved by setPrimaryKeys;
+    # nothing has been loaded, and setval() does not need a commit
+    if lastAnnotKey > 0 and not DEBUG:
+        try:
+            resetPrimaryKeys()
+        except:
+            pass
+
     try:
         diagFile.write('\n\nEnd Date/Time: %s\n' % (mgi_utils.date()))
         errorFile.write('\n\nEnd Date/Time: %s\n' % (mgi_utils.date()))
@@ -260,6 +292,22 @@ def exit(status, message = None):
 
     sys.exit(status)
  
+def sqlQuote(value):
+    '''
+    # requires: value (string)
+    #
+    # effects:
+    # db.sql() does not take bind parameters, so string values are
+    # interpolated into the SQL; double any single quotes so that
+    # the value cannot end the SQL string literal
+    #
+    # returns:
+    # the escaped value
+    #
+    '''
+
+    return value.replace("'", "''")
+
 def init():
     '''
     # requires: 
@@ -280,8 +328,7 @@ def init():
     global noteFile, noteFileName
     global annotTypeKey, annotKey, annotTypeName, evidencePrimaryKey
     global noteKey, propertyKey
-    global isMCV, isMP, isGO, isDiseaseMarker, isDiseaseAllele, isMPMarker, isMPAllele, isOMIMHPO
-    global loadType
+    global loadType, makeEvidenceKey
 
     db.set_sqlUser(user)
     db.set_sqlPasswordFromFile(passwordFileName)
@@ -302,32 +349,15 @@ def init():
         loadType = sys.argv[1]
         print('LOAD TYPE: %s' % sys.argv[1])
 
-        if loadType == 'mcv':
-            isMCV = 1
-
-        elif loadType == 'mp':
-            isMP = 1
+        if loadType not in loadTypes:
+            exit(1, 'Invalid Load Type: %s\n' % (loadType))
 
-        elif loadType == 'go':
-            isGO = 1
-
-        elif loadType == 'diseaseMarker':
-            isDiseaseMarker = 1
-        
-        elif loadType == 'diseaseAllele':
-            isDiseaseAllele = 1
-
-        elif loadType == 'mpMarker':
-            isMPMarker = 1
-
-        elif loadType == 'mpAllele':
-            isMPAllele = 1
-
-        elif loadType == 'omimhpo':
-            isOMIMHPO = 1
+    # the evidence duplicate-check key depends only on the load type,
+    # so pick its shape once here rather than per evidence record
+    makeEvidenceKey = evidenceKeyDict.get(loadType, defaultEvidenceKey)
         
     try:
-        inputFile = open(inputFileName, 'r')
+        inputFile = open(inputFileName, 'r', buffering=bcpFileBuffering)
     except:
         exit(1, 'Could not open file %s\n' % inputFileName)
             
@@ -342,22 +372,22 @@ def init():
         exit(1, 'Could not open file %s\n' % errorFileName)
             
     try:
-        annotFile = open(annotFileName, 'w')
+        annotFile = open(annotFileName, 'w', buffering=bcpFileBuffering)
     except:
         exit(1, 'Could not open file %s\n' % annotFileName)
             
     try:
-        evidenceFile = open(evidenceFileName, 'w')
+        evidenceFile = open(evidenceFileName, 'w', buffering=bcpFileBuffering)
     except:
         exit(1, 'Could not open file %s\n' % evidenceFileName)
             
     try:
-        propertyFile = open(propertyFileName, 'w')
+        propertyFile = open(propertyFileName, 'w', buffering=bcpFileBuffering)
     except:
         exit(1, 'Could not open file %s\n' % propertyFileName)
             
     try:
-        noteFile = open(noteFileName, 'w')
+        noteFile = open(noteFileName, 'w', buffering=bcpFileBuffering)
     except:
         exit(1, 'Could not open file %s\n' % noteFileName)
             
@@ -395,9 +425,9 @@ def verifyAnnotType():
 
     global annotTypeKey, annotTypeName
 
-    annotTypeName = re.sub('"', '', annotTypeName)
+    annotTypeName = annotTypeName.replace('"', '')
 
-    results = db.sql(''' select _AnnotType_key from VOC_AnnotType where name = '%s' ''' % (annotTypeName), 'auto')
+    results = db.sql(''' select _AnnotType_key from VOC_AnnotType where name = '%s' ''' % (sqlQuote(annotTypeName)), 'auto')
 
     if len(results) == 0:
         exit(1, 'Invalid Annotation Type Name: %s\n' % (annotTypeName))
@@ -432,18 +462,24 @@ def verifyMode():
 
         # verify deletion reference
 
+        #
+        # the deletion cascade is sent to the server as one batch;
+        # the statements run in order, so each delete sees the previous ones
+        #
+        deleteStmts = []
+
         #
         # create temp table toDelete
         #
         if delByReference != "J:0":
-            db.sql('''
+            deleteStmts.append('''
                 create temp table toDelete as 
                 select e._Annot_key, e._AnnotEvidence_key 
                 from VOC_Annot a, VOC_Evidence e
                 where e._Refs_key = %s
                 and e._Annot_key = a._Annot_key 
-                and a._AnnotType_key = %s
-                ''' % (delByReferenceKey, annotTypeKey), None, execute = not DEBUG)
+                and a._AnnotType_key = %s;
+                ''' % (delByReferenceKey, annotTypeKey))
 
         elif delByUser != "none%":
             # updated this to include the wildcard at the end of the comparison
@@ -451,65 +487,67 @@ def verifyMode():
             # variable.  (so this code was always getting executed, even when
             # the config file had the DELETEUSER set to 'none') - jsb, 11/3/14
 
-            db.sql('''
+            deleteStmts.append('''
                 create temp table toDelete as 
                 select e._Annot_key, e._AnnotEvidence_key
                 from VOC_Annot a, VOC_Evidence e, MGI_User u 
                 where e._CreatedBy_key = u._User_key 
                 and u.login like '%s'
                 and e._Annot_key = a._Annot_key
-                and a._AnnotType_key = %s
-                ''' % (delByUser, annotTypeKey), None, execute = not DEBUG)
+                and a._AnnotType_key = %s;
+                ''' % (sqlQuote(delByUser), annotTypeKey))
 
         else:
-            db.sql('''
+            deleteStmts.append('''
                 create temp table toDelete as 
                 select e._Annot_key, e._AnnotEvidence_key 
                 from VOC_Annot a, VOC_Evidence e
                 where a._AnnotType_key = %s
-                and a._Annot_key = e._Annot_key 
-                ''' % (annotTypeKey), None, execute = not DEBUG)
+                and a._Annot_key = e._Annot_key;
+                ''' % (annotTypeKey))
 
-        db.sql('create index td_idx1 on toDelete(_Annot_key)', None)
-        db.sql('create index td_idx2 on toDelete(_AnnotEvidence_key)', None)
+        deleteStmts.append('create index td_idx1 on toDelete(_Annot_key);')
+        deleteStmts.append('create index td_idx2 on toDelete(_AnnotEvidence_key);')
             
-        db.sql('''
+        deleteStmts.append('''
             delete from MGI_Note n
             using toDelete d, VOC_Evidence_Property p
             where d._AnnotEvidence_key = p._AnnotEvidence_key
             and p._EvidenceProperty_key = n._Object_key 
-            and n._MGIType_key = 41
-            ''', None, execute = not DEBUG)
+            and n._MGIType_key = 41;
+            ''')
 
-        db.sql('''
+        deleteStmts.append('''
             delete from VOC_Evidence_Property p
             using toDelete d
-            where d._AnnotEvidence_key = p._AnnotEvidence_key
-            ''', None, execute = not DEBUG)
+            where d._AnnotEvidence_key = p._AnnotEvidence_key;
+            ''')
 
-        db.sql('''
+        deleteStmts.append('''
             delete from VOC_Evidence e
             using toDelete d
-            where d._AnnotEvidence_key = e._AnnotEvidence_key
-            ''', None, execute = not DEBUG)
+            where d._AnnotEvidence_key = e._AnnotEvidence_key;
+            ''')
 
-        db.sql('''
+        deleteStmts.append('''
             delete from VOC_Annot a
             using toDelete d
             where d._Annot_key = a._Annot_key
-            and not exists (select 1 from VOC_Evidence e where d._Annot_key = e._Annot_key)
-            ''', None, execute = not DEBUG)
+            and not exists (select 1 from VOC_Evidence e where d._Annot_key = e._Annot_key);
+            ''')
 
         # remove the Used-FC references
-        if isMP:
-            db.sql('''
+        if loadType == 'mp':
+            deleteStmts.append('''
                 delete from MGI_Reference_Assoc
                 where _MGIType_key = 11
                 and _Refs_key = %s
-                and _RefAssocType_key = 1017
-                ''' % (delByReferenceKey), None, execute = not DEBUG)
+                and _RefAssocType_key = 1017;
+                ''' % (delByReferenceKey))
+
+        deleteStmts.append('''drop table todelete;''')
 
-        db.sql('''drop table todelete''', None)
+        db.sql('\n'.join(deleteStmts), None, execute = not DEBUG)
         db.commit()
             
     elif mode == 'append':
@@ -535,7 +573,9 @@ def verifyTerm(termID, lineNum, line):
     #		the Term exists 
     #		is of the appropriate type for the Annotation Type 
     #		    of the load 
-    #	writes to the error file if the Term is invalid
+    #	writes to the error file the first time an invalid Term is seen;
+    #	later lines with the same Term are counted in badTermDict
+    #	and reported by writeErrorSummary
     #
     # returns:
     #	0 if the Term is invalid
@@ -543,11 +583,15 @@ def verifyTerm(termID, lineNum, line):
     #
     '''
 
-    termKey = 0
+    termKey = termDict.get(termID.lower())
+
+    if termKey is None:
+        if termID in badTermDict:
+            badTermDict[termID] = badTermDict[termID] + 1
+            return(0)
+
+        badTermDict[termID] = 1
 
-    if termID in termDict:
-        termKey = termDict[termID]
-    else:
         if loadObsolete == '0':
             errorFile.write('Invalid or Obsolete Term (%d): %s\n%s\n' % (lineNum, termID, line))
         else:
@@ -566,7 +610,9 @@ def verifyReference(referenceID, lineNum, line):
     # effects:
     #	verifies that:
     #		the Reference  exists 
-    #	writes to the error file if the Reference is invalid
+    #	writes to the error file the first time an invalid Reference is seen;
+    #	later lines with the same Reference are counted in badReferenceDict
+    #	and reported by writeErrorSummary
     #
     # returns:
     #	0 if the Term is invalid
@@ -574,16 +620,46 @@ def verifyReference(referenceID, lineNum, line):
     #
     '''
 
-    referenceKey = 0
+    referenceKey = referenceDict.get(referenceID.lower())
 
-    if referenceID in referenceDict:
-        referenceKey = referenceDict[referenceID]
-    else:
+    if referenceKey is None:
+        if referenceID in badReferenceDict:
+            badReferenceDict[referenceID] = badReferenceDict[referenceID] + 1
+            return(0)
+
+        badReferenceDict[referenceID] = 1
         errorFile.write('Invalid Reference (%d): %s\n%s\n' % (lineNum, referenceID, line))
         referenceKey = 0
 
     return(referenceKey)
 
+def verifyUser(editor, lineNum):
+    '''
+    # requires:
+    #	editor - the Editor (MGI_User.login)
+    #	lineNum - the line number of the record from the input file
+    #
+    # effects:
+    #	verifies the Editor using loadlib.verifyUser, which
+    #	writes to the error file if the Editor is invalid
+    #	adds valid Editor/Key pairs to the global editorDict dictionary,
+    #	so each distinct Editor is looked up only once
+    #
+    # returns:
+    #	0 if the Editor is invalid
+    #	Editor Key if the Editor is valid
+    #
+    '''
+
+    editorKey = editorDict.get(editor)
+
+    if editorKey is None:
+        editorKey = loadlib.verifyUser(editor, lineNum, errorFile)
+        if editorKey:
+            editorDict[editor] = editorKey
+
+    return(editorKey)
+
 def verifyObject(objectID, logicalDBKey, lineNum, line):
     '''
     # requires:
@@ -595,40 +671,86 @@ def verifyObject(objectID, logicalDBKey, lineNum, line):
     # effects:
     #	verifies that the Object exists and is of the appropriate type
     #	for the Annotation Type of the load by checking the objectDict
-    #	dictionary for the object ID or the database.
+    #	dictionary (preloaded by loadObjectDict) for the object ID.
+    #	IDs that were not preloaded (i.e. non-preferred IDs) are
+    #	checked against the database.
     #	writes to the error file if the Object is invalid
     #	adds the Object ID/Key to the global objectDict dictionary if the
     #	object is valid
     #
+    #	objectDict keys are lower case, to match lower(a.accID)
+    #
+    #	the database lookup is prepared once (objectLookup), so the server
+    #	does not parse and plan it again for every line that misses
+    #
+    #	writes to the error file the first time an invalid Object is seen;
+    #	later lines with the same Object and logical DB are counted in
+    #	badObjectDict (without another database lookup) and reported by
+    #	writeErrorSummary
+    #
     # returns:
     #	0 if the Object is invalid
     #	Object Key if the Object is valid
     #
     '''
 
-    global objectDict
+    global objectDict, objectLookupPrepared
 
-    if objectID in objectDict:
-            objectKey = objectDict[objectID]
-    else:
-        results = db.sql('''
-            select a._Object_key 
-            from ACC_Accession a, VOC_AnnotType t
-            where lower(a.accID) = lower('%s')
-            and a._LogicalDB_key = %s
-            and a._MGIType_key = t._MGIType_key
-            and t._AnnotType_key = %s
-            ''' % (objectID, logicalDBKey, annotTypeKey), 'auto')
+    objectKey = objectDict.get(objectID.lower())
+
+    if objectKey is None:
+        # the lookup depends on the logical DB, which field 10 may change
+        badKey = (objectID, logicalDBKey)
+
+        if badKey in badObjectDict:
+            badObjectDict[badKey] = badObjectDict[badKey] + 1
+            return(0)
+
+        if not objectLookupPrepared:
+            db.sql('''
+                prepare objectLookup(text, int) as
+                select a._Object_key 
+                from ACC_Accession a, VOC_AnnotType t
+                where lower(a.accID) = lower($1)
+                and a._LogicalDB_key = $2
+                and a._MGIType_key = t._MGIType_key
+                and t._AnnotType_key = %s
+                ''' % (annotTypeKey), None)
+            objectLookupPrepared = 1
+
+        results = db.sql('''execute objectLookup('%s', %s)''' \
+            % (sqlQuote(objectID), logicalDBKey), 'auto')
 
         if len(results) == 1:
             objectKey = results[0]['_Object_key']
-            objectDict[objectID] = objectKey
+            objectDict[objectID.lower()] = objectKey
         else:
+            badObjectDict[badKey] = 1
             errorFile.write('Invalid Object (%d): %s\n%s\n' % (lineNum, objectID, line))
             objectKey = 0
 
     return(objectKey)
 
+def getLogicalDBKey(logicalDB):
+    '''
+    # requires:
+    #	logicalDB - the Logical DB name (field 10 of the input file)
+    #
+    # effects:
+    #	looks up the Logical DB key for the name, caching the result
+    #	in the global logicalDBDict dictionary so that each distinct
+    #	name is resolved only once
+    #
+    # returns:
+    #	the Logical DB key, or None if the name is invalid
+    #
+    '''
+
+    if logicalDB not in logicalDBDict:
+        logicalDBDict[logicalDB] = accessionlib.get_LogicalDB_key(logicalDB)
+
+    return(logicalDBDict[logicalDB])
+
 def setPrimaryKeys():
     '''
     # requires:
@@ -636,24 +758,107 @@ def setPrimaryKeys():
     # effects:
     #	Sets the global primary keys values needed for the load
     #
+    #	Reserves a block of keys from each sequence, sized from the
+    #	input file, so that the keys assigned by this load cannot be
+    #	handed out by the sequence to anyone else while it runs:
+    #		one VOC_Annot and VOC_Evidence key per line
+    #		one MGI_Note key per line with notes (field 9)
+    #		one VOC_Evidence_Property key per '&=&' in the line
+    #	(in preview mode nothing is loaded, so no block is reserved)
+    #
+    #	the unused end of each block is given back by resetPrimaryKeys
+    #
     # returns:
     #	nothing
     #
     '''
 
     global annotKey, evidencePrimaryKey, noteKey, propertyKey
+    global lastAnnotKey, lastEvidenceKey, lastNoteKey, lastPropertyKey
+
+    lineCount = 1
+    noteCount = 1
+    propertyCount = 1
+
+    if not DEBUG:
+        lineCount = 0
+        noteCount = 0
+        propertyCount = 0
+        with open(inputFileName, 'r') as countFile:
+            for line in countFile:
+                lineCount = lineCount + 1
+                tokens = line.rstrip('\r\n').split('\t', 9)
+                if len(tokens) > 8 and tokens[8].strip():
+                    noteCount = noteCount + 1
+                propertyCount = propertyCount + line.count('&=&')
+        lineCount = max(lineCount, 1)
+        noteCount = max(noteCount, 1)
+        propertyCount = max(propertyCount, 1)
+
+    # nextval() is the first key of the block;
+    # setval() moves the sequence to the last key of the block
+    results = db.sql('''
+        select setval('voc_annot_seq', nextval('voc_annot_seq') + %s) - %s as _Annot_key,
+               setval('voc_evidence_seq', nextval('voc_evidence_seq') + %s) - %s as _AnnotEvidence_key,
+               setval('mgi_note_seq', nextval('mgi_note_seq') + %s) - %s as _Note_key,
+               setval('voc_evidence_property_seq', nextval('voc_evidence_property_seq') + %s) - %s as _EvidenceProperty_key
+        ''' % ((lineCount - 1,) * 4 + (noteCount - 1,) * 2 + (propertyCount - 1,) * 2), 'auto')
+
+    annotKey = results[0]['_Annot_key']
+    evidencePrimaryKey = results[0]['_AnnotEvidence_key']
+    noteKey = results[0]['_Note_key']
+    propertyKey = results[0]['_EvidenceProperty_key']
+
+    lastAnnotKey = annotKey + lineCount - 1
+    lastEvidenceKey = evidencePrimaryKey + lineCount - 1
+    lastNoteKey = noteKey + noteCount - 1
+    lastPropertyKey = propertyKey + propertyCount - 1
+
+def resetPrimaryKeys():
+    '''
+    # requires:
+    #
+    # effects:
+    #	Gives back the unused end of each block reserved by setPrimaryKeys
+    #
+    #	if a sequence is still at the end of this load's block, it is set
+    #	to the last key assigned by this load, otherwise it is only moved
+    #	forward, never back into a reserved block; either way it is never
+    #	left behind the max key of its table
+    #
+    #	called by bcpFiles after the bcp, and by exit
+    #
+    # returns:
+    #	nothing
+    #
+    '''
 
-    results = db.sql(''' select nextval('voc_annot_seq') as maxKey ''', 'auto')
-    annotKey = results[0]['maxKey']
-
-    results = db.sql(''' select nextval('voc_evidence_seq') as maxKey ''', 'auto')
-    evidencePrimaryKey = results[0]['maxKey']
+    global execSQL, lastAnnotKey, lastEvidenceKey, lastNoteKey, lastPropertyKey
+
+    # update the voc_annot_seq, voc_evidence_seq, voc_evidence_property_seq
+    # and mgi_note_seq auto-sequences in one select statement
+    execSQL = '''select
+        setval('voc_annot_seq', greatest((select max(_Annot_key) from VOC_Annot),
+            (select case when last_value = %s then %s else last_value end from voc_annot_seq))),
+        setval('voc_evidence_seq', greatest((select max(_AnnotEvidence_key) from VOC_Evidence),
+            (select case when last_value = %s then %s else last_value end from voc_evidence_seq))),
+        setval('voc_evidence_property_seq', greatest((select max(_EvidenceProperty_key) from VOC_Evidence_Property),
+            (select case when last_value = %s then %s else last_value end from voc_evidence_property_seq))),
+        setval('mgi_note_seq', greatest((select max(_Note_key) from MGI_Note),
+            (select case when last_value = %s then %s else last_value end from mgi_note_seq)))''' \
+        % (lastAnnotKey, max(annotKey - 1, 1),
+           lastEvidenceKey, max(evidencePrimaryKey - 1, 1),
+           lastPropertyKey, max(propertyKey - 1, 1),
+           lastNoteKey, max(noteKey - 1, 1))
 
-    results = db.sql(''' select nextval('mgi_note_seq') as maxKey ''', 'auto')
-    noteKey = results[0]['maxKey']
+    print(execSQL)
+    db.sql(execSQL, None)
 
-    results = db.sql(''' select nextval('voc_evidence_property_seq') as maxKey ''', 'auto')
-    propertyKey = results[0]['maxKey']
+    # the blocks have been given back
+    lastAnnotKey = 0
+    lastEvidenceKey = 0
+    lastNoteKey = 0
+    lastPropertyKey = 0
 
 def loadReferenceDictionary():
     '''
@@ -678,8 +883,7 @@ def loadReferenceDictionary():
        and _LogicalDB_key = 1 
        and prefixPart = 'J:'
        ''', 'auto')
-    for r in results:
-        referenceDict[r['accID']] = r['_Object_key']
+    referenceDict.update((r['accID'].lower(), r['_Object_key']) for r in results)
 
 def loadDictionaries():
     '''
@@ -692,7 +896,12 @@ def loadDictionaries():
     #	nothing
     '''
 
-    global termDict, annotDict, evidenceDict, pTermDict
+    global termDict, annotDict, evidenceSet, pTermDict
+
+    # cache evidence codes and qualifiers (by term) for vocabloadlib
+
+    vocabloadlib.preloadEvidence(annotTypeKey)
+    vocabloadlib.preloadQualifier(annotTypeKey, 0)
 
     # cache annotation type vocabulary
 
@@ -711,8 +920,7 @@ def loadDictionaries():
 
     results = db.sql(cmd, 'auto')
 
-    for r in results:
-        termDict[r['accID']] = r['_Object_key']
+    termDict.update((r['accID'].lower(), r['_Object_key']) for r in results)
 
     # cache property vocabulary(s)
 
@@ -723,8 +931,7 @@ def loadDictionaries():
         ''' % (annotProperty)
     results = db.sql(cmd, 'auto')
 
-    for r in results:
-        pTermDict[r['term']] = r['_Term_key']
+    pTermDict.update((r['term'], r['_Term_key']) for r in results)
 
     # cache annotation keys for this type of annotation
 
@@ -733,12 +940,16 @@ def loadDictionaries():
         from VOC_Annot
         where _AnnotType_key = %s
         ''' % (annotTypeKey), 'auto')
-    for r in results:
-        key = '%s:%s:%s:%s' % (annotTypeKey, r['_Object_key'], r['_Term_key'], r['_Qualifier_key'])
-        value = r['_Annot_key']
-        annotDict[key] = value
+    annotDict.update(((r['_Object_key'], r['_Term_key'], r['_Qualifier_key']), r['_Annot_key'])
+        for r in results)
 
     # cache evidence keys for this type of annotation
+    # only the default duplicate key (annot, evidence, reference) can match
+    # these rows; load types that add properties/notes/inferred from to
+    # the key (see evidenceKeyDict) never match them, so skip this cache
+
+    if makeEvidenceKey is not defaultEvidenceKey:
+        return
 
     cmd = '''
         select e._Annot_key, e._EvidenceTerm_key, e._Refs_key 
@@ -747,12 +958,22 @@ def loadDictionaries():
         and a._Annot_key = e._Annot_key''' % (annotTypeKey)
 
     results = db.sql(cmd, 'auto')
-    for r in results:
-        key = '%s:%s:%s' % (r['_Annot_key'], r['_EvidenceTerm_key'], r['_Refs_key'])
-        value = r['_Annot_key']
-        evidenceDict[key] = value
+    evidenceSet.update((r['_Annot_key'], r['_EvidenceTerm_key'], r['_Refs_key']) for r in results)
 
 def loadObjectDict():
+    '''
+    # requires:
+    #
+    # effects:
+    #	loads the global objectDict dictionary with the preferred
+    #	accession ids of the Annotation Type's MGI Type for the
+    #	current logicalDBKey, so that verifyObject is a dictionary lookup.
+    #	keys are lower case, to match verifyObject.
+    #
+    # returns:
+    #	nothing
+    '''
+
     global objectDict
 
     # cache object keys
@@ -766,10 +987,7 @@ def loadObjectDict():
         and a.preferred = 1
         and a._MGIType_key = t._MGIType_key
         and t._AnnotType_key = %s''' % (logicalDBKey, annotTypeKey), 'auto')
-    for r in results:
-        key = r['accID']
-        value = r['_Object_key']
-        objectDict[key] = value
+    objectDict.update((r['accID'].lower(), r['_Object_key']) for r in results)
 
 def createAnnotationRecord(objectKey, termKey, qualifierKey, entryDate):
     '''
@@ -783,8 +1001,8 @@ def createAnnotationRecord(objectKey, termKey, qualifierKey, entryDate):
     #	determines the primary key of the Annotation record
     #	by checking the global annotDict dictionary or the database
     #
-    #	if this is a new Annotation record, writes a new record
-    #	to the annotFile (bcp), adds the new annotation key
+    #	if this is a new Annotation record, adds a new record
+    #	to the annotBuf (bcp), adds the new annotation key
     #	to the global annotDict dictionary and increments the global
     #	annotKey counter.
     #
@@ -798,21 +1016,22 @@ def createAnnotationRecord(objectKey, termKey, qualifierKey, entryDate):
 
     # if an annotation already exists for the same 
     # AnnotType/Object/Term/Qualifier, use the same annotation key
+    # (annotTypeKey is the same for the whole run, so it is not part of the key)
 
-    aKey = '%s:%s:%s:%s' % (annotTypeKey, objectKey, termKey, qualifierKey)
+    aKey = (objectKey, termKey, qualifierKey)
 
     # annotation may exist in our dictionary already...
 
-    if aKey in annotDict:
-        useAnnotKey = annotDict[aKey]
-    else:
+    useAnnotKey = annotDict.get(aKey)
+
+    if useAnnotKey is None:
         useAnnotKey = annotKey
         annotDict[aKey] = useAnnotKey
         annotKey = annotKey + 1
 
         # create the new VOC_Annot record
 
-        annotFile.write('%s\t%s\t%s\t%s\t%s\t%s\t%s\n' \
+        annotBuf.append('%s\t%s\t%s\t%s\t%s\t%s\t%s\n' \
                 % (useAnnotKey, annotTypeKey, objectKey, termKey, qualifierKey, entryDate, entryDate))
 
     return(useAnnotKey)
@@ -834,55 +1053,47 @@ def createEvidenceRecord(newAnnotKey, evidenceKey, referenceKey, \
     #
     # effects:
     #	determines if this Evidence record is a duplicate
-    #	by checking the global evidenceDict dictionary or the database
+    #	by checking the global evidenceSet set or the database
     #
     #	if this is a duplicate, then writes to the error file and returns
-    #	if new Evidence record, writes a new record to the evidenceFile (bcp)
-    #	and adds the new evidence key to the global evidenceDict dictionary
+    #	if new Evidence record, adds a new record to the evidenceBuf (bcp)
+    #	and adds the new evidence key to the global evidenceSet set
     #
     # returns:
     #	nothing
     #
     '''
 
-    global evidencePrimaryKey, evidenceDict, noteKey, propertyKey
+    global evidencePrimaryKey, evidenceSet, noteKey, propertyKey
 
     #
-    # evidenceDict is used to check for duplicates:
-    #	1) existing annotation (in the database) : see loadDictionaries/evidenceDict)
+    # evidenceSet is used to check for duplicates:
+    #	1) existing annotation (in the database) : see loadDictionaries/evidenceSet)
+    #
+    # keys are tuples, so no key string is built per record;
+    # the fields used depend on the load type (see init/makeEvidenceKey)
     #
 
-    if isMP or isOMIMHPO:
-            eKey = '%s:%s:%s:%s' % (newAnnotKey, evidenceKey, referenceKey, properties)
-
-    elif isMPMarker or isMPAllele:
-            eKey = '%s:%s:%s:%s:%s' % (newAnnotKey, evidenceKey, referenceKey, properties, notes)
-
-    elif isGO or isDiseaseMarker or isDiseaseAllele:
-            eKey = '%s:%s:%s:%s:%s' % (newAnnotKey, evidenceKey, referenceKey, properties, inferredFrom)
-
-    # default duplication check
-    else:
-            eKey = '%s:%s:%s' % (newAnnotKey, evidenceKey, referenceKey)
+    eKey = makeEvidenceKey(newAnnotKey, evidenceKey, referenceKey, properties, notes, inferredFrom)
 
-    # evidence record may exist in our dictionary already
+    # evidence record may exist in our set already
     # if so, it's a duplicate; let's report it
-    if eKey in evidenceDict:
+    if eKey in evidenceSet:
             errorFile.write('Duplicate evidence (%d): \n%s\n' % (lineNum, line))
             return
 
     else:
         # not a duplicate
-        evidenceDict[eKey] = eKey
+        evidenceSet.add(eKey)
 
-    evidenceFile.write('%s\t%s\t%s\t%s\t%s\t%s\t%s\t%s\t%s\n' \
+    evidenceBuf.append('%s\t%s\t%s\t%s\t%s\t%s\t%s\t%s\t%s\n' \
             % (evidencePrimaryKey, newAnnotKey, evidenceKey, referenceKey, \
                 inferredFrom, editorKey, editorKey, entryDate, entryDate))
 
     # storing data in MGI_Note
     if len(notes) > 0:
 
-        noteFile.write('%s\t%s\t%s\t%s\t%s\t%s\t%s\t%s\t%s\n' \
+        noteBuf.append('%s\t%s\t%s\t%s\t%s\t%s\t%s\t%s\t%s\n' \
             % (noteKey, evidencePrimaryKey, mgiNoteObjectKey, mgiNoteTypeKey, notes, \
                editorKey, editorKey, entryDate, entryDate))
 
@@ -901,33 +1112,117 @@ def createEvidenceRecord(newAnnotKey, evidenceKey, referenceKey, \
 
     if len(properties) > 0:
 
-        stanza = 1
-        allStanzas = str.split(properties, '&===&')
+        # bind globals used per property to locals
+        getPTermKey = pTermDict.get
+        addProperty = propertyBuf.append
+        writeError = errorFile.write
+        pKey = propertyKey
+
+        # every property line of this record ends with
+        # createdBy/modifiedBy/creation_date/modification_date; format it once
+        tail = '\t%s\t%s\t%s\t%s\n' % (editorKey, editorKey, entryDate, entryDate)
 
-        for s in allStanzas:
+        for stanza, s in enumerate(properties.split('&===&'), 1):
 
             seqnum = 1
-            allProps = str.split(s, '&==&')
 
-            for p in allProps:
+            for p in s.split('&==&'):
 
-                #printproperties
-                pTerm, pValue = str.split(p,'&=&')
+                # partition returns (term, '&=&', value) without building a list
+                pTerm, sep, pValue = p.partition('&=&')
 
-                if pTerm in pTermDict:
-                    propertyFile.write('%s\t%s\t%s\t%s\t%s\t%s\t%s\t%s\t%s\t%s\n' \
-                    % (propertyKey, evidencePrimaryKey, pTermDict[pTerm], stanza, seqnum, pValue, \
-                       editorKey, editorKey, entryDate, entryDate))
+                # a pair without '&=&' is malformed; it is not loaded,
+                # so setPrimaryKeys' '&=&' count stays an upper bound
+                if not sep:
+                    writeError('Invalid Property (%s):  %s\n%s\n' % (lineNum, p, line))
+                    continue
+
+                pTermKey = getPTermKey(pTerm)
+
+                if pTermKey is not None:
+                    addProperty('%s\t%s\t%s\t%s\t%s\t%s%s' \
+                    % (pKey, evidencePrimaryKey, pTermKey, stanza, seqnum, pValue, tail))
 
                     seqnum = seqnum + 1
-                    propertyKey = propertyKey + 1
+                    pKey = pKey + 1
                 else:
-                    errorFile.write('Invalid Property (%s):  %s\n%s\n' % (lineNum, pTerm, line))
+                    writeError('Invalid Property (%s):  %s\n%s\n' % (lineNum, pTerm, line))
 
-            stanza = stanza + 1
+        propertyKey = pKey
 
     evidencePrimaryKey = evidencePrimaryKey + 1
 
+def flushBuffers():
+    '''
+    # requires:
+    #
+    # effects:
+    #	writes the buffered bcp lines to the bcp files
+    #	and empties the buffers
+    #
+    # returns:
+    #	nothing
+    #
+    '''
+
+    annotFile.writelines(annotBuf)
+    evidenceFile.writelines(evidenceBuf)
+    noteFile.writelines(noteBuf)
+    propertyFile.writelines(propertyBuf)
+
+    del annotBuf[:]
+    del evidenceBuf[:]
+    del noteBuf[:]
+    del propertyBuf[:]
+
+def parseLine(line, lineNum):
+    '''
+    # requires:
+    #	line - the line from the input file
+    #	lineNum - the line number of the record from the input file
+    #
+    # effects:
+    #	splits the line into its fields (see Input)
+    #	if field 10 names a valid logical DB, sets the global logicalDBKey
+    #	exits if the line does not have the 9 required fields
+    #
+    # returns:
+    #	termID, objectID, jnum, evidence, inferredFrom, qualifier,
+    #	editor, entryDate, notes, properties
+    #
+    '''
+
+    global logicalDBKey
+
+    # Split the line into tokens
+    # field 12+ is ignored, so stop splitting after field 11
+    tokens = line.rstrip('\r\n').split('\t', 11)
+
+    try:
+        termID, objectID, jnum, evidence, inferredFrom, qualifier, editor, entryDate, notes = \
+            [t.strip() if t else t for t in tokens[:9]]
+    except:
+        exit(1, 'Invalid Line (%d): \n%s\n' % (lineNum, line))
+
+    # If the entry date is not given, use the load date
+    entryDate = entryDate or loaddate
+    properties = ''
+
+    if len(tokens) > 9:
+        # field 10 reserved for optional ldb
+        # the default is "1" (MGI)
+        col10 = getLogicalDBKey(tokens[9].strip())
+
+        if col10 != None:
+            logicalDBKey = col10
+
+        if len(tokens) > 10:
+            # field 11 reserved for optional properties
+            properties = tokens[10].strip()
+
+    return(termID, objectID, jnum, evidence, inferredFrom, qualifier,
+        editor, entryDate, notes, properties)
+
 def processMcvFile():
     '''
     # requires:
@@ -943,48 +1238,38 @@ def processMcvFile():
     #       nothing
     #
     '''
-    global logicalDBKey, annotDict, skipBCP
+    global annotDict, skipBCP
 
     skipBCP = 0
 
-    # running list of markers in the input so we don't delete more than once
-    mkrKeyList = []
+    # running set of markers in the input so we don't delete more than once
+    mkrKeySet = set()
 
     #  we first delete all annotations by marker, 
     # then recreate based on the input
-    deleteSQL = '''delete from VOC_Annot where _AnnotType_key = %s and _Object_key = %s'''
-    lineNum = 0
+    # the markers are collected while reading the input and their
+    # annotations are deleted with one statement after the last line;
+    # the new annotations are only loaded later, by bcpFiles
+    deleteSQL = '''delete from VOC_Annot where _AnnotType_key = %s and _Object_key = any(array[%s])'''
+    objectDictLoaded = 0
 
     # For each line in the input file
-    for line in inputFile.readlines():
-        lineNum = lineNum + 1
+    for lineNum, line in enumerate(inputFile, 1):
 
-        # Split the line into tokens
-        tokens = str.split(line[:-1], '\t')
+        # progress for large delete-only runs; per-line stdout is too costly
+        if lineNum % 10000 == 0:
+            diagFile.write('Processed %d lines: %s\n' % (lineNum, mgi_utils.date()))
 
-        try:
-            termID = tokens[0]
-            mgiID = tokens[1]
-            jnum = tokens[2]
-            evidence = tokens[3]
-            inferredFrom = str.strip(tokens[4])
-            qualifier = str.strip(tokens[5])
-            editor = str.strip(tokens[6])
-            entryDate = str.strip(tokens[7])
-            notes = str.strip(tokens[8])
-            properties = ''
-
-            if len(tokens) > 9:
-                # field 10 reserved for optional ldb the default is "1" (MGI)
-                col10 = accessionlib.get_LogicalDB_key(tokens[9])
-                if col10 != None:
-                    logicalDBKey = col10
-            if len(tokens) > 10:
-                # field 11 reserved for optional properties
-                properties = str.strip(tokens[10])
+        if lineNum % bcpBufferSize == 0:
+            flushBuffers()
 
-        except:
-            exit(1, 'Invalid Line (%d): \n%s\n' % (lineNum, line))
+        termID, mgiID, jnum, evidence, inferredFrom, qualifier, editor, entryDate, notes, properties = \
+            parseLine(line, lineNum)
+
+        # for files that specify logicalDB - we won't know that value until we get the first term
+        if objectDictLoaded == 0:
+            loadObjectDict()
+            objectDictLoaded = 1
 
         # if we just have an MGI ID delete all annotations and continue
         if termID == '' and jnum == '' and evidence == '' and \
@@ -994,14 +1279,15 @@ def processMcvFile():
 
             if markerKey == 0: # not valid
                 # skip this record, verifyObject logs to discrepancy file
-                print('skipping record, invalid MGI ID for delete only mode')
+                if DEBUG:
+                    print('skipping record, invalid MGI ID for delete only mode')
                 continue
             else:
                 # delete existing annotations for this marker/annotation type
                 # and go on to next record
-                print('delete only mode, deleting all annotations for %s' % markerKey)
-                print(deleteSQL % (annotTypeKey, markerKey))
-                db.sql(deleteSQL % (annotTypeKey, markerKey), None)
+                if DEBUG:
+                    print('delete only mode, deleting all annotations for %s' % markerKey)
+                mkrKeySet.add(markerKey)
                 continue
 
         # if we get here, continue verifying
@@ -1010,7 +1296,7 @@ def processMcvFile():
         referenceKey = verifyReference(jnum, lineNum, line)
         evidenceKey = vocabloadlib.verifyEvidence(evidence, annotTypeKey, lineNum, errorFile)
         qualifierKey = vocabloadlib.verifyQualifier(qualifier, annotTypeKey, 0, lineNum, errorFile)
-        editorKey = loadlib.verifyUser(editor, lineNum, errorFile)
+        editorKey = verifyUser(editor, lineNum)
         
         # if any verification failed, this is an error
         if termKey == 0 or markerKey == 0 or \
@@ -1021,22 +1307,14 @@ def processMcvFile():
 
             continue
 
-        # If the entry date is not given, use the current date
-        if len(entryDate) == 0:
-            entryDate = loaddate
-
         # if we get here, there are no errors so process the annotation
 
-        # first delete if we haven't already seen this marker in the input
-        if not markerKey in mkrKeyList:
-            db.sql(deleteSQL % (annotTypeKey, markerKey), None)
-            mkrKeyList.append(markerKey)
+        # delete later, if we haven't already seen this marker in the input
+        mkrKeySet.add(markerKey)
 
         # then create annotations
         # first delete from annotDict, because we've deleted from the database
-        aKey = '%s:%s:%s:%s' % (annotTypeKey, markerKey, termKey, qualifierKey)
-        if aKey in annotDict:
-            del annotDict[aKey]
+        annotDict.pop((markerKey, termKey, qualifierKey), None)
 
         # now create an annotation record
         newAnnotKey = createAnnotationRecord( \
@@ -1054,6 +1332,10 @@ def processMcvFile():
             line, \
             lineNum)
 
+    # delete existing annotations for all markers in the input
+    if len(mkrKeySet) > 0:
+        db.sql(deleteSQL % (annotTypeKey, ','.join(map(str, mkrKeySet))), None)
+
     db.commit()
 
 def processFile():
@@ -1069,48 +1351,20 @@ def processFile():
     #
     '''
 
-    global logicalDBKey
     global skipBCP
 
-    lineNum = 0
-
     # For each line in the input file
     objectDictLoaded = 0
 
-    for line in inputFile.readlines():
+    for lineNum, line in enumerate(inputFile, 1):
 
         error = 0
-        lineNum = lineNum + 1
 
-        # Split the line into tokens
-        tokens = str.split(line[:-1], '\t')
+        if lineNum % bcpBufferSize == 0:
+            flushBuffers()
 
-        try:
-            termID = tokens[0]
-            objectID = tokens[1]
-            jnum = tokens[2]
-            evidence = tokens[3]
-            inferredFrom = str.strip(tokens[4])
-            qualifier = str.strip(tokens[5])
-            editor = str.strip(tokens[6])
-            entryDate = str.strip(tokens[7])
-            notes = str.strip(tokens[8])
-            properties = ''
-
-            if len(tokens) > 9:
-                # field 10 reserved for optional ldb
-                # the default is "1" (MGI)
-                col10 = accessionlib.get_LogicalDB_key(str.strip(tokens[9]))
-
-                if col10 != None:
-                    logicalDBKey = col10
-
-                if len(tokens) > 10:
-                    # field 11 reserved for optional properties
-                    properties = str.strip(tokens[10])
-
-        except:
-            exit(1, 'Invalid Line (%d): \n%s\n' % (lineNum, line))
+        termID, objectID, jnum, evidence, inferredFrom, qualifier, editor, entryDate, notes, properties = \
+            parseLine(line, lineNum)
 
         # for files that specify logicalDB - we won't know that value until we get the first term
         if objectDictLoaded == 0:
@@ -1122,7 +1376,7 @@ def processFile():
         referenceKey = verifyReference(jnum, lineNum, line)
         evidenceKey = vocabloadlib.verifyEvidence(evidence, annotTypeKey, lineNum, errorFile)
         qualifierKey = vocabloadlib.verifyQualifier(qualifier, annotTypeKey, 0, lineNum, errorFile)
-        editorKey = loadlib.verifyUser(editor, lineNum, errorFile)
+        editorKey = verifyUser(editor, lineNum)
 
         if termKey == 0 or \
             objectKey == 0 or \
@@ -1134,10 +1388,6 @@ def processFile():
             # set error flag to true
             error = 1
 
-        # If the entry date is not given, use the current date
-        if len(entryDate) == 0:
-            entryDate = loaddate
-
         # if errors, continue to next record
         if error:
             continue
@@ -1159,9 +1409,31 @@ def processFile():
         # don't skip the bcp file loading...data exists that needs to be loaded
         skipBCP = 0
 
-    # end of "for line in inputFile.readlines():"
+    # end of "for lineNum, line in enumerate(inputFile, 1):"
     db.commit()
 
+def writeErrorSummary():
+    '''
+    # requires:
+    #
+    # effects:
+    #	writes the number of lines per invalid Term, Reference and Object
+    #	to the error file (only the first such line is written in full)
+    #
+    # returns:
+    #	nothing
+    #
+    '''
+
+    for label, badDict in (('Term', badTermDict), ('Reference', badReferenceDict), ('Object', badObjectDict)):
+        if len(badDict) == 0:
+            continue
+        errorFile.write('\n%d unique invalid %s(s):\n' % (len(badDict), label))
+        for badID, count in sorted(badDict.items()):
+            if label == 'Object':
+                badID = '%s (logical DB %s)' % badID
+            errorFile.write('%s\t%d line(s)\n' % (badID, count))
+
 def bcpFiles():
     '''
     # requires:
@@ -1174,7 +1446,7 @@ def bcpFiles():
     #
     '''
 
-    global execSQL
+    flushBuffers()
 
     annotFile.close()
     evidenceFile.close()
@@ -1184,63 +1456,58 @@ def bcpFiles():
     if DEBUG:
         return
 
-    if skipBCP:
-        return 0
+    # nothing to bcp; the reserved keys are still given back below
+    if not skipBCP:
 
-    db.commit()
+        db.commit()
 
-    bcpCommand = os.environ['PG_DBUTILS'] + '/bin/bcpin.csh'
-    currentDir = os.getcwd()
-
-    bcpAnnotCmd = '%s %s %s %s %s %s "\\t" "\\n" mgd' % \
-        (bcpCommand, db.get_sqlServer(), db.get_sqlDatabase(),'VOC_Annot',
-        currentDir, annotFileName)
-    diagFile.write('%s\n' % bcpAnnotCmd)
-
-    bcpEvidenceCmd = '%s %s %s %s %s %s "\\t" "\\n" mgd' % \
-        (bcpCommand, db.get_sqlServer(), db.get_sqlDatabase(),'VOC_Evidence',
-        currentDir, evidenceFileName)
-    diagFile.write('%s\n' % bcpEvidenceCmd)
-
-    bcpNoteCmd = '%s %s %s %s %s %s "\\t" "\\n" mgd' % \
-        (bcpCommand, db.get_sqlServer(), db.get_sqlDatabase(),'MGI_Note',
-        currentDir, noteFileName)
-    diagFile.write('%s\n' % bcpNoteCmd)
-
-    bcpPropertyCmd = '%s %s %s %s %s %s "\\t" "\\n" mgd' % \
-        (bcpCommand, db.get_sqlServer(), db.get_sqlDatabase(),'VOC_Evidence_Property',
-        currentDir, propertyFileName)
-    diagFile.write('%s\n' % bcpPropertyCmd)
-
-    print('BCPing files')
-    os.system(bcpAnnotCmd)
-    os.system(bcpEvidenceCmd)
-    os.system(bcpNoteCmd)
-    os.system(bcpPropertyCmd)
-    print('BCP done')
-
-    # update voc_annot_seq auto-sequence
-    execSQL = '''select setval('voc_annot_seq', (select max(_Annot_key) from VOC_Annot))'''
-    print(execSQL)
-    db.sql(execSQL, None)
-    db.commit()
+        bcpCommand = os.environ['PG_DBUTILS'] + '/bin/bcpin.csh'
+        currentDir = os.getcwd()
 
-    # update voc_evidence_seq auto-sequence
-    execSQL = '''select setval('voc_evidence_seq', (select max(_AnnotEvidence_key) from VOC_Evidence))'''
-    print(execSQL)
-    db.sql(execSQL, None)
-    db.commit()
+        bcpAnnotCmd = '%s %s %s %s %s %s "\\t" "\\n" mgd' % \
+            (bcpCommand, db.get_sqlServer(), db.get_sqlDatabase(),'VOC_Annot',
+            currentDir, annotFileName)
+        diagFile.write('%s\n' % bcpAnnotCmd)
 
-    # update voc_evidence_property_seq auto-sequence
-    execSQL = '''select setval('voc_evidence_property_seq', (select max(_EvidenceProperty_key) from VOC_Evidence_Property))'''
-    print(execSQL)
-    db.sql(execSQL, None)
-    db.commit()
+        bcpEvidenceCmd = '%s %s %s %s %s %s "\\t" "\\n" mgd' % \
+            (bcpCommand, db.get_sqlServer(), db.get_sqlDatabase(),'VOC_Evidence',
+            currentDir, evidenceFileName)
+        diagFile.write('%s\n' % bcpEvidenceCmd)
 
-    # update mgi_note_seq auto-sequence
-    execSQL = '''select setval('mgi_note_seq', (select max(_Note_key) from MGI_Note))'''
-    print(execSQL)
-    db.sql(''' select setval('mgi_note_seq', (select max(_Note_key) from MGI_Note)) ''', None)
+        bcpNoteCmd = '%s %s %s %s %s %s "\\t" "\\n" mgd' % \
+            (bcpCommand, db.get_sqlServer(), db.get_sqlDatabase(),'MGI_Note',
+            currentDir, noteFileName)
+        diagFile.write('%s\n' % bcpNoteCmd)
+
+        bcpPropertyCmd = '%s %s %s %s %s %s "\\t" "\\n" mgd' % \
+            (bcpCommand, db.get_sqlServer(), db.get_sqlDatabase(),'VOC_Evidence_Property',
+            currentDir, propertyFileName)
+        diagFile.write('%s\n' % bcpPropertyCmd)
+
+        # bcpin.csh starts a new database session per file;
+        # skip it for empty files (i.e. loads without notes or properties)
+        #
+        # VOC_Evidence references VOC_Annot, so those are loaded in order;
+        # MGI_Note and VOC_Evidence_Property only depend on VOC_Evidence,
+        # so they are loaded at the same time
+        print('BCPing files')
+        for bcpStage in (((bcpAnnotCmd, annotFileName),),
+                         ((bcpEvidenceCmd, evidenceFileName),),
+                         ((bcpNoteCmd, noteFileName), (bcpPropertyCmd, propertyFileName))):
+            bcpCmds = []
+            for bcpCmd, bcpFileName in bcpStage:
+                if os.path.getsize(bcpFileName) > 0:
+                    bcpCmds.append(bcpCmd)
+                else:
+                    diagFile.write('skipping empty bcp file: %s\n' % (bcpFileName))
+            if len(bcpCmds) == 0:
+                continue
+            with concurrent.futures.ThreadPoolExecutor(max_workers=len(bcpCmds)) as executor:
+                list(executor.map(os.system, bcpCmds))
+        print('BCP done')
+
+    # give back the unused end of the reserved key blocks
+    resetPrimaryKeys()
     db.commit()
 
 #
@@ -1268,11 +1535,12 @@ setPrimaryKeys()
 loadDictionaries()
 
 #print('\nannotload.py - process')
-if isMCV:
+if loadType == 'mcv':
     processMcvFile()
 else:
     processFile()
 
+writeErrorSummary()
 bcpFiles()
 
 print('\nannotload.py - main() finished')
@@ -11,11 +11,79 @@ import db
 
 ecodeDict = {}         # evidence codes
 qualifierDict = {}     # qualifiers
+ecodeLoaded = None     # annotTypeKey that ecodeDict was loaded for
+qualifierLoaded = None # (annotTypeKey, byAbbrev) that qualifierDict was loaded for
+
+# Purpose:  load the Evidence Codes of the Annotation Type
+# Returns:  nothing
+# Assumes:  nothing
+# Effects:  (re)loads the ecode dictionary; call once, before verifyEvidence
+# Throws:  nothing
+
+def preloadEvidence(
+    annotTypeKey  # Annotation Type key, (str.
+    ):
+
+    global ecodeDict, ecodeLoaded
+
+    ecodeDict.clear()
+
+    results = db.sql('''
+            select e._Term_key, e.abbreviation
+            from VOC_Term e, VOC_AnnotType t
+            where e._Vocab_key = t._EvidenceVocab_key
+            and t._AnnotType_key = %s
+            ''' % (annotTypeKey), 'auto')
+
+    for r in results:
+        ecodeDict[r['abbreviation']] = r['_Term_key']
+
+    ecodeLoaded = annotTypeKey
+
+# Purpose:  load the Qualifiers of the Annotation Type
+# Returns:  nothing
+# Assumes:  nothing
+# Effects:  (re)loads the qualifier dictionary; call once, before verifyQualifier
+# Throws:  nothing
+
+def preloadQualifier(
+    annotTypeKey, # Annotation Type key, (str.
+    byAbbrev 	  # Compare by Abbreviation (1) or by Term (0)
+    ):
+
+    global qualifierDict, qualifierLoaded
+
+    qualifierDict.clear()
+
+    if byAbbrev:
+        results = db.sql('''
+            select e._Term_key, e.abbreviation
+            from VOC_Term e, VOC_AnnotType t
+            where e._Vocab_key = t._QualifierVocab_key 
+            and t._AnnotType_key = %s
+            ''' % (annotTypeKey), 'auto')
+
+        for r in results:
+            qualifierDict[r['abbreviation']] = r['_Term_key']
+
+    else:
+        results = db.sql('''
+            select e._Term_key, e.term
+            from VOC_Term e, VOC_AnnotType t
+            where e._Vocab_key = t._QualifierVocab_key
+            and t._AnnotType_key = %s
+            ''' % (annotTypeKey), 'auto')
+
+        for r in results:
+            qualifierDict[r['term']] = r['_Term_key']
+
+    qualifierLoaded = (annotTypeKey, byAbbrev)
 
 # Purpose:  verify Evidence Code
 # Returns:  Evidence Code key if valid, else 0
 # Assumes:  nothing
 # Effects:  verifies that the Evidence Code exists in the ecode dictionary
+#	calls preloadEvidence if it has not been called for this Annotation Type
 #	writes to the error file if the Evidence Code is invalid
 # Throws:  nothing
 
@@ -26,24 +94,12 @@ def verifyEvidence(
     errorFile	   # error file (file descriptor)
     ):
 
-    global ecodeDict
-
-    ecodeKey = 0
-
-    if len(ecodeDict) == 0:
-        results = db.sql('''
-                select e._Term_key, e.abbreviation
-                from VOC_Term e, VOC_AnnotType t
-                where e._Vocab_key = t._EvidenceVocab_key
-                and t._AnnotType_key = %s
-                ''' % (annotTypeKey), 'auto')
+    if ecodeLoaded != annotTypeKey:
+        preloadEvidence(annotTypeKey)
 
-        for r in results:
-            ecodeDict[r['abbreviation']] = r['_Term_key']
+    ecodeKey = ecodeDict.get(ecode, 0)
 
-    if ecode in ecodeDict:
-        ecodeKey = ecodeDict[ecode]
-    else:
+    if ecodeKey == 0:
         if errorFile != None:
             errorFile.write('Invalid Evidence Code (%d): %s\n' % (lineNum, ecode))
 
@@ -53,6 +109,8 @@ def verifyEvidence(
 # Returns:  Qualifier key if valid, else 0
 # Assumes:  nothing
 # Effects:  verifies that the Qualifier exists in the qualifier dictionary
+#	calls preloadQualifier if it has not been called for this
+#	Annotation Type and byAbbrev
 #	writes to the error file if the Qualifier is invalid
 # Throws:  nothing
 
@@ -64,40 +122,15 @@ def verifyQualifier(
     errorFile	  # error file (file descriptor)
     ):
 
-    global qualifierDict
-
-    qualifierKey = 0
-
-    if len(qualifierDict) == 0:
-
-        if byAbbrev:
-            results = db.sql('''
-                select e._Term_key, e.abbreviation
-                from VOC_Term e, VOC_AnnotType t
-                where e._Vocab_key = t._QualifierVocab_key 
-                and t._AnnotType_key = %s
-                ''' % (annotTypeKey), 'auto')
-
-            for r in results:
-                qualifierDict[r['abbreviation']] = r['_Term_key']
-
-        else:
-            results = db.sql('''
-                select e._Term_key, e.term
-                from VOC_Term e, VOC_AnnotType t
-                where e._Vocab_key = t._QualifierVocab_key
-                and t._AnnotType_key = %s
-                ''' % (annotTypeKey), 'auto')
-
-            for r in results:
-                qualifierDict[r['term']] = r['_Term_key']
+    if qualifierLoaded != (annotTypeKey, byAbbrev):
+        preloadQualifier(annotTypeKey, byAbbrev)
 
     if len(qualifier) == 0:
         qualifier = None
 
-    if qualifier in qualifierDict:
-        qualifierKey = qualifierDict[qualifier]
-    else:
+    qualifierKey = qualifierDict.get(qualifier, 0)
+
+    if qualifierKey == 0:
         if errorFile != None:
             errorFile.write('Invalid Qualifier (%d): %s\n' % (lineNum, qualifier))
 